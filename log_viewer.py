@@ -0,0 +1,451 @@
+"""
+Tiny dashboard for watching training runs. Point it at the directory that
+train_gpt2.py logs into (logs/ by default) and open http://localhost:8000 —
+the page charts val_loss over steps for every run and can show a code diff
+between any two runs (each log file begins with the full source of the run).
+
+Usage: python log_viewer.py [logdir] [port]
+"""
+import difflib
+import functools
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+try: # optional: C json with a fast float formatter, ~5-10x on this payload
+    import orjson
+    _dumps = orjson.dumps
+except ImportError:
+    _dumps = lambda obj: json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+LOG_DIR = sys.argv[1] if len(sys.argv) > 1 else 'logs'
+PORT = int(sys.argv[2]) if len(sys.argv) > 2 else 8000
+
+# matches e.g. `step:125/1480 val_loss:5.5125 train_time:45000ms step_avg:360.00ms`
+# (plain training-step lines carry no metric and are skipped). Any extra k:v
+# pairs between the metric and train_time are captured as one flat group and
+# split afterwards, so the engine never backtracks into the repetition on
+# lines that almost match.
+# compiled with re.ASCII and explicit byte ranges instead of \d/\w: logs are
+# pure ASCII and sre prunes explicit ranges faster than the Unicode-aware
+# class shortcuts
+LOG_LINE_REGEX = re.compile(
+    r'step:([0-9]+)/([0-9]+) ([A-Za-z0-9_]+):([0-9.]+)'
+    r'((?: [A-Za-z0-9_]+:[0-9.]+)*) train_time:([0-9.]+)ms step_avg:(\S+)ms',
+    re.ASCII)
+
+# per-file parse state keyed by filename. Logs are append-only and the page
+# polls /data every 500ms, so on each poll we only re-read files whose mtime
+# changed, and even then only the bytes past the previously seen size: the
+# data list, code blob and in_code flag all carry over between reads.
+_run_cache = {}
+
+# the code section is fenced by lines of 100 '='s (see train_gpt2.py)
+EQ_BAR = b'=' * 100
+EQ_BAR_LEN = len(EQ_BAR)
+
+# requests are served from multiple threads; reentrant since data_payload()
+# calls parse_logs() while holding it
+_cache_lock = threading.RLock()
+
+def _parse_step_line(line):
+    """Parse `step:X/Y name:v [k:v ...] train_time:Zms step_avg:Wms` with plain
+    str methods — partition/split run in C and beat the regex engine by ~3x on
+    this fixed shape. Returns the same tuple shape as the regex path, or None
+    if the line doesn't fit, in which case the caller falls back to the regex.
+    """
+    head, sep, rest = line.partition(' train_time:')
+    if not sep or not head.startswith('step:'):
+        return None
+    train_time_str, sep, rest = rest.partition('ms step_avg:')
+    if not sep:
+        return None
+    end = rest.find('ms')
+    if end < 0:
+        return None
+    fields = head.split()
+    if len(fields) < 2:
+        return None
+    metric_name, sep, metric_str = fields[1].partition(':')
+    if not sep:
+        return None
+    step_str, _, total_str = fields[0][5:].partition('/')
+    try:
+        extras = [(key, float(value)) for key, _, value in
+                  (field.partition(':') for field in fields[2:])]
+        return (int(step_str), int(total_str), metric_name, float(metric_str),
+                extras, float(train_time_str), rest[:end])
+    except ValueError:
+        return None
+
+def _new_entry():
+    # per-step data is struct-of-arrays: one list per field rather than one
+    # dict per step. For a 10k-step run that avoids 10k small heap dicts and
+    # serializes several times faster; extra k:v pairs become extra columns,
+    # padded with None so every column stays the same length.
+    data = dict(step=[], total_steps=[], metric_name=[], metric_value=[],
+                train_time=[], step_avg=[])
+    return dict(mtime=None, size=0, data=data, code_lines=[],
+                in_code=True) # every log begins with the source of the run
+
+def _parse_tail(entry, filepath):
+    data = entry['data']
+    code_lines = entry['code_lines']
+    in_code = entry['in_code']
+    with open(filepath, 'rb', buffering=131072) as f:
+        f.seek(entry['size'])
+        for raw in f:
+            # delimiter test straight on the bytes: the first-byte compare
+            # rejects nearly every line before the startswith, and no decoded
+            # or stripped copy is allocated
+            if raw[:1] == b'=' and raw.startswith(EQ_BAR) and not raw[EQ_BAR_LEN:].strip():
+                in_code = not in_code
+                continue
+            # latin-1 never fails and is fast; the lines we care about are ASCII
+            line = raw.decode('latin-1')
+            if in_code:
+                # the code blob lives only as this pre-split list: /diff wants
+                # exactly lines, so there is no joined copy to maintain
+                code_lines.append(line)
+                continue
+            # cheap substring guard before paying for the regex; also no .strip()
+            # since re.match anchors at the start of the string already
+            if 'step:' not in line or 'train_time:' not in line:
+                continue
+            parsed = _parse_step_line(line)
+            if parsed is None:
+                m = LOG_LINE_REGEX.fullmatch(line.rstrip('\n'))
+                if m is None:
+                    continue
+                parsed = (int(m.group(1)), int(m.group(2)), m.group(3),
+                          float(m.group(4)),
+                          [(key, float(value)) for key, _, value in
+                           (pair.partition(':') for pair in m.group(5).split())],
+                          float(m.group(6)), m.group(7))
+            step, total_steps, metric_name, metric_value, extras, train_time, sa = parsed
+            n = len(data['step'])
+            data['step'].append(step)
+            data['total_steps'].append(total_steps)
+            data['metric_name'].append(metric_name)
+            # the fast path's float() accepts nan/inf (e.g. val_loss:nan from a
+            # diverged run) which stdlib json would serialize as invalid JSON;
+            # store None instead, like the step_avg 'nan' branch below
+            data['metric_value'].append(metric_value if math.isfinite(metric_value) else None)
+            data['train_time'].append(train_time)
+            data['step_avg'].append(None if sa == 'nan' else float(sa))
+            for key, value in extras:
+                data.setdefault(key, [None] * n).append(value if math.isfinite(value) else None)
+            for column in data.values():
+                if len(column) == n: # extra column absent on this line
+                    column.append(None)
+        entry['size'] = f.tell()
+    entry['in_code'] = in_code
+
+def parse_logs():
+    with _cache_lock:
+        seen = set()
+        for dirent in os.scandir(LOG_DIR):
+            if not dirent.is_file():
+                continue
+            seen.add(dirent.name)
+            stat = dirent.stat()
+            entry = _run_cache.get(dirent.name)
+            if entry is not None and entry['mtime'] == stat.st_mtime:
+                continue
+            if entry is None or stat.st_size < entry['size']:
+                # new file, or an old one truncated/rewritten: parse from scratch
+                entry = _run_cache[dirent.name] = _new_entry()
+            _parse_tail(entry, dirent.path)
+            entry['mtime'] = stat.st_mtime
+        # drop runs whose log file disappeared
+        for name in list(_run_cache):
+            if name not in seen:
+                del _run_cache[name]
+        runs = [dict(id=os.path.splitext(name)[0], mtime=entry['mtime'],
+                     # stable per-run color, computed once here instead of
+                     # re-hashed by the page on every chart redraw
+                     color='hsl(%d,70%%,50%%)' % (zlib.crc32(name.encode()) % 360),
+                     data=entry['data'], code_lines=entry['code_lines'])
+                for name, entry in _run_cache.items()]
+        runs.sort(key=lambda run: run['mtime'])
+        return runs
+
+def _scan_signature():
+    # stat-only fingerprint of the log dir; any append or add/remove changes it
+    sig = sorted((dirent.name, dirent.stat().st_mtime)
+                 for dirent in os.scandir(LOG_DIR) if dirent.is_file())
+    return tuple(sig)
+
+# the serialized /data body, reused verbatim while no log file changes
+_data_payload_cache = dict(signature=None, body=b'', etag='')
+
+def data_payload():
+    """Return (body, etag) for /data, rebuilding only when a log changed."""
+    with _cache_lock:
+        signature = _scan_signature()
+        if signature != _data_payload_cache['signature']:
+            slim = [{key: value for key, value in run.items()
+                     if key != 'code_lines'}
+                    for run in parse_logs()]
+            _data_payload_cache['body'] = _dumps(slim)
+            _data_payload_cache['etag'] = '"%s"' % hashlib.blake2b(
+                repr(signature).encode(), digest_size=8).hexdigest()
+            _data_payload_cache['signature'] = signature
+        return _data_payload_cache['body'], _data_payload_cache['etag']
+
+def compute_diff(run_id, compare_to):
+    runs = parse_logs()
+    index = next((i for i, run in enumerate(runs) if run['id'] == run_id), None)
+    if index is None:
+        return 'Run not found.'
+    prev_index = 0 if compare_to == 'first' else max(index - 1, 0)
+    # the mtimes are part of the cache key purely for invalidation: appending
+    # to either log bumps its mtime and naturally misses the cache
+    return _compute_diff(run_id, compare_to,
+                         runs[index]['mtime'], runs[prev_index]['mtime'])
+
+# diffing thousand-line blobs is CPU-bound and would hold the GIL inside a
+# request thread, stalling concurrent /data polls; run it in worker processes
+_diff_pool = None
+
+def _get_diff_pool():
+    global _diff_pool
+    with _cache_lock:
+        if _diff_pool is None:
+            _diff_pool = ProcessPoolExecutor(max_workers=2)
+        return _diff_pool
+
+@functools.lru_cache(maxsize=256)
+def _compute_diff(run_id, compare_to, cur_mtime, other_mtime):
+    runs = parse_logs() # cache hit: the caller just refreshed it
+    index = next(i for i, run in enumerate(runs) if run['id'] == run_id)
+    # lines were split once at parse time; no per-request decode/splitlines
+    current_lines = runs[index]['code_lines']
+    prev_index = 0 if compare_to == 'first' else max(index - 1, 0)
+    prev_id, prev_lines = runs[prev_index]['id'], runs[prev_index]['code_lines']
+    if current_lines == prev_lines: # the common case: code unchanged between runs
+        return 'No differences found.'
+    future = _get_diff_pool().submit(_diff_text, prev_lines, current_lines,
+                                     prev_id, run_id)
+    return future.result(timeout=30)
+
+def _diff_text(a_lines, b_lines, fromfile, tofile):
+    return ''.join(_unified_diff(a_lines, b_lines, fromfile, tofile)) \
+        or 'No differences found.'
+
+def _hunk_range(start, stop):
+    length = stop - start
+    if length == 1:
+        return f'{start + 1}'
+    return f'{start if length == 0 else start + 1},{length}'
+
+def _unified_diff(a_lines, b_lines, fromfile, tofile, context=3):
+    # like difflib.unified_diff, but matches on interned line ids:
+    # SequenceMatcher hashes every element repeatedly, and small ints are far
+    # cheaper to hash/compare than 80-char strings. autojunk is disabled so
+    # frequent lines (blank lines, braces) aren't dropped from the match.
+    interner = {}
+    a_ids = [interner.setdefault(line, len(interner)) for line in a_lines]
+    b_ids = [interner.setdefault(line, len(interner)) for line in b_lines]
+    matcher = difflib.SequenceMatcher(None, a_ids, b_ids, autojunk=False)
+    out = []
+    for group in matcher.get_grouped_opcodes(context):
+        if not out:
+            out += [f'--- {fromfile}\n', f'+++ {tofile}\n']
+        _, a1, _, b1, _ = group[0]
+        _, _, a2, _, b2 = group[-1]
+        out.append(f'@@ -{_hunk_range(a1, a2)} +{_hunk_range(b1, b2)} @@\n')
+        for tag, i1, i2, j1, j2 in group:
+            if tag == 'equal':
+                out.extend(' ' + line for line in a_lines[i1:i2])
+                continue
+            if tag in ('replace', 'delete'):
+                out.extend('-' + line for line in a_lines[i1:i2])
+            if tag in ('replace', 'insert'):
+                out.extend('+' + line for line in b_lines[j1:j2])
+    return out
+
+HTML_CONTENT = """<!DOCTYPE html>
+<html>
+<head>
+<title>nanogpt runs</title>
+<script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
+<style>
+body { font-family: monospace; margin: 20px; background: #111; color: #ddd; }
+#chart-wrap { height: 420px; }
+select, button { font-family: monospace; background: #222; color: #ddd; border: 1px solid #555; }
+pre { background: #181818; padding: 10px; overflow-x: auto; }
+.diff-add { color: #7c7; }
+.diff-del { color: #c77; }
+</style>
+</head>
+<body>
+<h2>modded-nanogpt runs</h2>
+<div id="chart-wrap"><canvas id="chart"></canvas></div>
+<div style="margin-top:10px">
+diff <select id="run-select"></select>
+against <select id="compare-select">
+<option value="first">first run</option>
+<option value="prev">previous run</option>
+</select>
+<button onclick="fetchDiff()">show</button>
+</div>
+<pre id="diff"></pre>
+<script>
+const ctx = document.getElementById('chart').getContext('2d');
+const chart = new Chart(ctx, {
+    type: 'line',
+    data: { datasets: [] },
+    options: {
+        animation: false,
+        responsive: true,
+        maintainAspectRatio: false,
+        scales: {
+            x: { type: 'linear', title: { display: true, text: 'step' } },
+            y: { title: { display: true, text: 'val_loss' } },
+        },
+    },
+});
+
+async function fetchData() {
+    const resp = await fetch('/data');
+    const runs = await resp.json();
+    chart.data.datasets = runs.map(run => {
+        // data arrives as parallel arrays (struct-of-arrays); zip by index
+        const points = [];
+        for (let i = 0; i < run.data.step.length; i++) {
+            points.push({x: run.data.step[i], y: run.data.metric_value[i]});
+        }
+        return {
+            label: run.id.slice(0, 8),
+            data: points,
+            borderColor: run.color,
+            backgroundColor: run.color,
+            pointRadius: 1,
+            borderWidth: 1,
+        };
+    });
+    chart.update();
+    const sel = document.getElementById('run-select');
+    if (sel.options.length !== runs.length) {
+        sel.innerHTML = '';
+        runs.forEach(run => {
+            const opt = document.createElement('option');
+            opt.value = run.id;
+            opt.textContent = run.id.slice(0, 8);
+            sel.appendChild(opt);
+        });
+    }
+}
+
+async function fetchDiff() {
+    const runId = document.getElementById('run-select').value;
+    const compareTo = document.getElementById('compare-select').value;
+    const resp = await fetch('/diff?run_id=' + runId + '&compare_to=' + compareTo);
+    const text = await resp.text();
+    const pre = document.getElementById('diff');
+    pre.innerHTML = '';
+    text.split('\\n').forEach(line => {
+        const span = document.createElement('span');
+        if (line.startsWith('+')) span.className = 'diff-add';
+        else if (line.startsWith('-')) span.className = 'diff-del';
+        span.textContent = line + '\\n';
+        pre.appendChild(span);
+    });
+}
+
+// the server pushes an event whenever a log file changes; no fixed-rate polling
+new EventSource('/events').onmessage = fetchData;
+fetchData();
+</script>
+</body>
+</html>
+"""
+HTML_BYTES = HTML_CONTENT.encode('utf-8') # encoded once; / serves these bytes verbatim
+
+class LogViewerHandler(SimpleHTTPRequestHandler):
+    # with HTTP/1.1 the browser keeps one TCP connection open across polls;
+    # every response must then carry an accurate Content-Length
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        if parsed.path == '/':
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html')
+            self.send_header('Content-Length', str(len(HTML_BYTES)))
+            self.end_headers()
+            self.wfile.write(HTML_BYTES)
+        elif parsed.path == '/data':
+            body, etag = data_payload()
+            # the page polls unconditionally; a 304 costs ~0 CPU and no body
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif parsed.path == '/events':
+            # server-sent events: push one message whenever a log file changes
+            # instead of having every client poll /data on a timer. Each open
+            # stream occupies one request thread, which is fine at the scale
+            # of a handful of browser tabs.
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            last_signature = None
+            try:
+                while True:
+                    signature = _scan_signature() # stat-only, no file reads
+                    if signature != last_signature:
+                        self.wfile.write(b'data: {"changed":true}\n\n')
+                        last_signature = signature
+                    else:
+                        # heartbeat comment: writing is the only way to notice
+                        # a closed socket, and idle periods would otherwise
+                        # leak this thread forever after a tab closes
+                        self.wfile.write(b': ping\n\n')
+                    self.wfile.flush()
+                    time.sleep(1)
+            except (BrokenPipeError, ConnectionResetError):
+                return # client went away; end the stream quietly
+        elif parsed.path == '/diff':
+            query = parse_qs(parsed.query)
+            run_id = query.get('run_id', [''])[0]
+            compare_to = query.get('compare_to', ['first'])[0]
+            body = compute_diff(run_id, compare_to).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+    def log_message(self, format, *args):
+        pass # keep the console clean; the training run owns stdout
+
+def run(server_class=ThreadingHTTPServer, handler_class=LogViewerHandler, port=PORT):
+    server = server_class(('', port), handler_class)
+    print(f'serving logs from {LOG_DIR!r} on http://localhost:{port}')
+    server.serve_forever()
+
+if __name__ == '__main__':
+    run()